@@ -1,41 +1,82 @@
 """Flask API and web UI for ticket listing dashboard."""
+import queue
 import sqlite3
-from flask import Flask, jsonify, render_template
+import orjson
+from flask import Flask, Response, g, jsonify, render_template, stream_with_context
+from flask_caching import Cache
 from flask_cors import CORS
 
 app = Flask(__name__)
 CORS(app)
 
+# The monitor writes tickets.db from a separate process, so cached entries
+# can't be invalidated on insert; keep the TTL short instead.
+cache = Cache(app, config={"CACHE_TYPE": "SimpleCache"})
+
 DB_PATH = "tickets.db"
 
+TICKET_COLUMNS = ("first_seen", "price", "quantity", "section", "row")
+
+# Idle connections shared by all request threads. Werkzeug's dev server
+# starts a thread per client connection, so per-thread reuse wouldn't help.
+POOL_SIZE = 8
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+
 
 def get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn = g.get("db")
+    if conn is None:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            # WAL is persistent in the file (the monitor sets it), so readers
+            # only tune their own cache
+            conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA cache_size=-20000")
+            conn.execute("PRAGMA mmap_size=268435456")
+        g.db = conn
     return conn
 
 
+@app.teardown_appcontext
+def release_db(exc):
+    """Return the request's connection to the pool for the next request."""
+    conn = g.pop("db", None)
+    if conn is None:
+        return
+    # Roll back anything a failed request may have left open
+    if conn.in_transaction:
+        conn.rollback()
+    try:
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+
+
 @app.route("/")
 def index():
     return render_template("index.html")
 
 
 @app.route("/api/matches", methods=["GET"])
+@cache.cached(timeout=60, key_prefix="matches_v1")
 def list_matches():
     """Return distinct match names from the database."""
     conn = get_db()
     cur = conn.cursor()
     cur.execute("SELECT DISTINCT match_name FROM seen_tickets ORDER BY match_name")
     rows = cur.fetchall()
-    conn.close()
     return jsonify([r["match_name"] for r in rows])
 
 
 @app.route("/api/matches/<path:match_name>/tickets", methods=["GET"])
 def get_tickets(match_name):
-    """Return tickets for a match: first_seen, price, quantity, section, row."""
-    conn = get_db()
-    cur = conn.cursor()
+    """Stream tickets for a match: first_seen, price, quantity, section, row."""
+    cur = get_db().cursor()
+    # Plain tuples are cheaper than sqlite3.Row; zip them against fixed names
+    cur.row_factory = None
+    cur.arraysize = 500
     cur.execute(
         """
         SELECT first_seen, price, quantity, section, row
@@ -45,10 +86,25 @@ def get_tickets(match_name):
     """,
         (match_name,),
     )
-    rows = cur.fetchall()
-    conn.close()
-    return jsonify([dict(r) for r in rows])
+
+    # Serialize one fetchmany() batch at a time rather than materializing
+    # every row, then a list of dicts, then the jsonify buffer.
+    def generate():
+        cols = TICKET_COLUMNS
+        yield b"["
+        first = True
+        while True:
+            rows = cur.fetchmany()
+            if not rows:
+                break
+            chunk = b",".join(orjson.dumps(dict(zip(cols, r))) for r in rows)
+            yield chunk if first else b"," + chunk
+            first = False
+        yield b"]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
 
 
 if __name__ == "__main__":
-    app.run(debug=True, port=5000)
+    # Development server; see README for running under gunicorn
+    app.run(debug=True, port=5000, threaded=True)
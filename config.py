@@ -1,13 +1,25 @@
 """Configuration management for ticket monitoring system."""
+import functools
 import os
+import re
 from dataclasses import dataclass
 from typing import List, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+_MATCH_NAME_KEY = re.compile(r'MATCH_([1-9]\d*)_NAME$')
+_WHITESPACE = re.compile(r'\s+')
 
-@dataclass
+
+@functools.lru_cache(maxsize=128)
+def _slugify(match_name: str) -> str:
+    """Convert "Arsenal vs Everton" to "arsenal-everton"."""
+    normalized = _WHITESPACE.sub(' ', match_name.strip().lower())
+    return normalized.replace(' vs ', '-').replace(' ', '-')
+
+
+@dataclass(frozen=True)
 class SearchCriteria:
     """Search criteria for ticket matching."""
     match_name: str
@@ -18,12 +30,11 @@ class SearchCriteria:
     
     def get_event_url(self, base_url: str) -> str:
         """Construct event URL from match name."""
-        # Convert "Arsenal vs Everton" to "tickets-arsenal-everton"
-        match_slug = self.match_name.lower().replace(' vs ', '-').replace(' ', '-')
-        return f"{base_url}/tickets-{match_slug}"
+        # "Arsenal vs Everton" -> "{base_url}/tickets-arsenal-everton"
+        return f"{base_url}/tickets-{_slugify(self.match_name)}"
 
 
-@dataclass
+@dataclass(frozen=True)
 class NotificationSettings:
     """Notification configuration."""
     email_enabled: bool = False
@@ -60,11 +71,12 @@ class NotificationSettings:
         )
 
 
-@dataclass
+@dataclass(frozen=True)
 class MonitorSettings:
     """Monitoring configuration."""
     check_interval_minutes: int = 30
     base_url: str = 'https://fanpass.net'
+    cdp_endpoint: Optional[str] = None  # Shared Chromium to attach to instead of launching one
     
     @classmethod
     def from_env(cls) -> 'MonitorSettings':
@@ -72,7 +84,8 @@ class MonitorSettings:
         interval = int(os.getenv('CHECK_INTERVAL_MINUTES', '30'))
         return cls(
             check_interval_minutes=interval,
-            base_url=os.getenv('FANPASS_BASE_URL', 'https://fanpass.net')
+            base_url=os.getenv('FANPASS_BASE_URL', 'https://fanpass.net'),
+            cdp_endpoint=os.getenv('PLAYWRIGHT_CDP_ENDPOINT') or None
         )
 
 
@@ -87,19 +100,24 @@ class Config:
     def _load_searches(self) -> List[SearchCriteria]:
         """Load search criteria for all matches."""
         searches = []
-        match_num = 1
+        # Snapshot the environment once instead of calling os.getenv per key
+        env = dict(os.environ)
         
-        # Load matches in format: MATCH_1_NAME, MATCH_1_MIN_TICKETS, MATCH_1_MAX_PRICE
-        while True:
-            match_name = os.getenv(f'MATCH_{match_num}_NAME')
+        # Load matches in format: MATCH_1_NAME, MATCH_1_MIN_TICKETS, MATCH_1_MAX_PRICE.
+        # Collect every numbered match so a gap (e.g. no MATCH_2) doesn't hide later ones.
+        match_nums = sorted(
+            int(m.group(1)) for m in map(_MATCH_NAME_KEY.match, env) if m
+        )
+        
+        for match_num in match_nums:
+            match_name = env[f'MATCH_{match_num}_NAME']
             if not match_name:
-                # No more matches found
-                break
+                continue
             
-            min_tickets = os.getenv(f'MATCH_{match_num}_MIN_TICKETS')
-            max_price = os.getenv(f'MATCH_{match_num}_MAX_PRICE')
-            trustable_seller_only = os.getenv(f'MATCH_{match_num}_TRUSTABLE_SELLER_ONLY', 'true').lower() == 'true'
-            notify_seen_tickets = os.getenv(f'MATCH_{match_num}_NOTIFY_SEEN_TICKETS', 'false').lower() == 'true'
+            min_tickets = env.get(f'MATCH_{match_num}_MIN_TICKETS')
+            max_price = env.get(f'MATCH_{match_num}_MAX_PRICE')
+            trustable_seller_only = env.get(f'MATCH_{match_num}_TRUSTABLE_SELLER_ONLY', 'true').lower() == 'true'
+            notify_seen_tickets = env.get(f'MATCH_{match_num}_NOTIFY_SEEN_TICKETS', 'false').lower() == 'true'
             
             if not min_tickets or not max_price:
                 raise ValueError(
@@ -120,16 +138,14 @@ class Config:
                 raise ValueError(
                     f"Invalid configuration for MATCH_{match_num}: {e}"
                 )
-            
-            match_num += 1
         
         # If no matches found with MATCH_N format, try legacy single match format
         if not searches:
-            match_name = os.getenv('MATCH_NAME')
-            min_tickets = os.getenv('MIN_TICKETS', '2')
-            max_price = os.getenv('MAX_PRICE', '500')
-            trustable_seller_only = os.getenv('TRUSTABLE_SELLER_ONLY', 'true').lower() == 'true'
-            notify_seen_tickets = os.getenv('NOTIFY_SEEN_TICKETS', 'false').lower() == 'true'
+            match_name = env.get('MATCH_NAME')
+            min_tickets = env.get('MIN_TICKETS', '2')
+            max_price = env.get('MAX_PRICE', '500')
+            trustable_seller_only = env.get('TRUSTABLE_SELLER_ONLY', 'true').lower() == 'true'
+            notify_seen_tickets = env.get('NOTIFY_SEEN_TICKETS', 'false').lower() == 'true'
             
             if match_name:
                 try:
@@ -1,25 +1,94 @@
 """SQLite database for tracking seen tickets."""
+import functools
+import hashlib
 import sqlite3
 import logging
 from typing import List, Dict, Set, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=4096, typed=True)
+def generate_ticket_id(price: float, quantity: int, section: Optional[str], row: Optional[str]) -> str:
+    """Generate a stable ID for a ticket listing.
+    
+    This is a dedup key, not a security boundary, so it uses BLAKE2b
+    rather than MD5. TicketDatabase re-keys stored rows with it on upgrade.
+    Memoized because the same listings come back on every check; typed so
+    100 and 100.0, which format differently, never share a cache entry.
+    """
+    ticket_str = f"{price}_{quantity}_{section or ''}_{row or ''}"
+    return hashlib.blake2b(ticket_str.encode(), digest_size=16).hexdigest()
+
+
 class TicketDatabase:
     """Manages SQLite database for tracking seen tickets."""
     
+    # Stay under SQLite's default host-parameter limit (999 on older builds)
+    MAX_QUERY_PARAMS = 900
+    
+    # Prepared statements kept per connection; each distinct IN (...) arity
+    # in get_new_tickets takes its own slot, so allow more than the default.
+    STATEMENT_CACHE_SIZE = 256
+    
+    # Bump when _init_database gains a migration step
+    SCHEMA_VERSION = 2
+    
     def __init__(self, db_path: str = 'tickets.db'):
         self.db_path = db_path
+        self._conn: Optional[sqlite3.Connection] = None
         self._init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Return the shared connection, opening it on first use.
+        
+        The connection lives as long as this object so sqlite3's prepared
+        statement cache is reused across calls instead of re-parsing SQL.
+        """
+        if self._conn is not None:
+            return self._conn
+        
+        conn = sqlite3.connect(self.db_path, cached_statements=self.STATEMENT_CACHE_SIZE)
+        # WAL makes NORMAL safe: commits no longer fsync, only checkpoints do
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-64000')
+        conn.execute('PRAGMA mmap_size=268435456')
+        self._conn = conn
+        return conn
+    
+    def close(self):
+        """Close the shared connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
     def _init_database(self):
         """Initialize database schema."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._connect()
+        
+        # Already-initialized databases skip the DDL (and its write transaction)
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        if version >= self.SCHEMA_VERSION:
+            logger.info("Database ready at %s (schema v%d)", self.db_path, version)
+            return
+        
+        if version < 1:
+            self._create_schema(conn)
+        if version < 2:
+            self._rekey_ticket_ids(conn)
+        
+        logger.info("Database initialized at %s (schema v%d)", self.db_path, self.SCHEMA_VERSION)
+    
+    def _create_schema(self, conn: sqlite3.Connection):
+        """Schema v1: table and indexes."""
+        # WAL is persistent in the file, so readers (app.py) never block the writer
+        conn.execute('PRAGMA journal_mode=WAL')
         
-        cursor.execute('''
+        conn.executescript('''
+            BEGIN;
+            
             CREATE TABLE IF NOT EXISTS seen_tickets (
                 ticket_id TEXT PRIMARY KEY,
                 match_name TEXT NOT NULL,
@@ -30,33 +99,56 @@ class TicketDatabase:
                 url TEXT NOT NULL,
                 first_seen TIMESTAMP NOT NULL,
                 last_seen TIMESTAMP NOT NULL
-            )
-        ''')
-        
-        # Create index on match_name for faster queries
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_match_name 
-            ON seen_tickets(match_name)
+            );
+            
+            -- Covering index for the dashboard's per-match query: serves
+            -- WHERE match_name = ? ORDER BY first_seen without a sort or table lookup.
+            -- Its leading column also covers match_name lookups, so the old
+            -- idx_match_name is redundant.
+            CREATE INDEX IF NOT EXISTS idx_match_firstseen_cov
+            ON seen_tickets(match_name, first_seen, price, quantity, section, row);
+            DROP INDEX IF EXISTS idx_match_name;
+            
+            -- Index last_seen so cleanup_old_tickets doesn't scan the table
+            CREATE INDEX IF NOT EXISTS idx_last_seen
+            ON seen_tickets(last_seen);
+            
+            PRAGMA user_version = 1;
+            
+            COMMIT;
         ''')
+    
+    def _rekey_ticket_ids(self, conn: sqlite3.Connection):
+        """Schema v2: recompute stored ticket IDs with the current hash (was MD5).
         
-        conn.commit()
-        conn.close()
-        logger.info(f"Database initialized at {self.db_path}")
+        IDs are derived only from stored columns, so existing rows keep
+        deduplicating against freshly scraped listings.
+        """
+        with conn:
+            rows = conn.execute('SELECT ticket_id, price, quantity, section, row FROM seen_tickets').fetchall()
+            conn.executemany(
+                'UPDATE seen_tickets SET ticket_id = ? WHERE ticket_id = ?',
+                [
+                    (generate_ticket_id(price, quantity, section, row), ticket_id)
+                    for ticket_id, price, quantity, section, row in rows
+                ]
+            )
+            conn.execute('PRAGMA user_version = 2')
+        logger.info("Re-keyed %d seen tickets", len(rows))
     
     def is_seen(self, ticket_id: str) -> bool:
         """Check if a ticket has been seen before."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('SELECT 1 FROM seen_tickets WHERE ticket_id = ?', (ticket_id,))
         result = cursor.fetchone()
         
-        conn.close()
         return result is not None
     
     def mark_seen(self, ticket: Dict, match_name: str):
         """Mark a ticket as seen (insert or update)."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         now = datetime.now().isoformat()
@@ -91,7 +183,6 @@ class TicketDatabase:
             ))
         
         conn.commit()
-        conn.close()
     
     def get_new_tickets(self, tickets: List[Dict], match_name: str) -> List[Dict]:
         """
@@ -104,21 +195,65 @@ class TicketDatabase:
         Returns:
             List of tickets that haven't been seen before
         """
-        new_tickets = []
+        tickets = [t for t in tickets if t.get('ticket_id')]
+        ids = list({t['ticket_id'] for t in tickets})
+        now = datetime.now().isoformat()
         
-        for ticket in tickets:
-            ticket_id = ticket.get('ticket_id')
-            if ticket_id and not self.is_seen(ticket_id):
+        conn = self._connect()
+        with conn:
+            cursor = conn.cursor()
+            
+            # Look up which IDs we already know in as few queries as possible
+            seen = set()
+            for i in range(0, len(ids), self.MAX_QUERY_PARAMS):
+                chunk = ids[i:i + self.MAX_QUERY_PARAMS]
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(
+                    f'SELECT ticket_id FROM seen_tickets WHERE ticket_id IN ({placeholders})',
+                    chunk
+                )
+                seen.update(row[0] for row in cursor.fetchall())
+            
+            new_tickets = []
+            new_rows = []
+            for ticket in tickets:
+                ticket_id = ticket['ticket_id']
+                if ticket_id in seen:
+                    continue
+                # Identical listings share an ID; only report the first one
+                seen.add(ticket_id)
                 new_tickets.append(ticket)
-                # Mark as seen immediately
-                self.mark_seen(ticket, match_name)
+                new_rows.append((
+                    ticket_id,
+                    match_name,
+                    ticket.get('price', 0),
+                    ticket.get('quantity', 0),
+                    ticket.get('section'),
+                    ticket.get('row'),
+                    ticket.get('url', ''),
+                    now,
+                    now
+                ))
+            
+            new_ids = {row[0] for row in new_rows}
+            existing_rows = [(now, ticket_id) for ticket_id in ids if ticket_id not in new_ids]
+            
+            cursor.executemany('''
+                INSERT INTO seen_tickets
+                (ticket_id, match_name, price, quantity, section, row, url, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', new_rows)
+            cursor.executemany(
+                'UPDATE seen_tickets SET last_seen = ? WHERE ticket_id = ?',
+                existing_rows
+            )
         
-        logger.info(f"Found {len(new_tickets)} new tickets out of {len(tickets)} total")
+        logger.info("Found %d new tickets out of %d total", len(new_tickets), len(tickets))
         return new_tickets
     
     def get_seen_ticket_ids(self, match_name: Optional[str] = None) -> Set[str]:
         """Get set of all seen ticket IDs, optionally filtered by match."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         if match_name:
@@ -127,21 +262,17 @@ class TicketDatabase:
             cursor.execute('SELECT ticket_id FROM seen_tickets')
         
         ticket_ids = {row[0] for row in cursor.fetchall()}
-        conn.close()
         
         return ticket_ids
     
     def cleanup_old_tickets(self, days: int = 30):
         """Remove tickets older than specified days."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
         
-        cutoff_date = datetime.now().replace(day=datetime.now().day - days).isoformat()
-        cursor.execute('DELETE FROM seen_tickets WHERE last_seen < ?', (cutoff_date,))
-        
-        deleted_count = cursor.rowcount
-        conn.commit()
-        conn.close()
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute('DELETE FROM seen_tickets WHERE last_seen < ?', (cutoff_date,))
+            deleted_count = cursor.rowcount
         
-        logger.info(f"Cleaned up {deleted_count} old tickets")
+        logger.info("Cleaned up %d old tickets", deleted_count)
         return deleted_count
@@ -1,8 +1,9 @@
 """Main monitoring loop with periodic checks."""
+import asyncio
 import logging
-import time
-from typing import List
-from apscheduler.schedulers.blocking import BlockingScheduler
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from config import Config, SearchCriteria
@@ -19,64 +20,127 @@ class TicketMonitor:
     
     def __init__(self, config: Config):
         self.config = config
-        self.scraper = TicketScraper(base_url=config.monitor.base_url)
+        self.scraper = TicketScraper(
+            base_url=config.monitor.base_url,
+            cdp_endpoint=config.monitor.cdp_endpoint
+        )
         self.database = TicketDatabase()
         self.notifications = NotificationService(config.notifications)
-        self.scheduler = BlockingScheduler()
+        self.scheduler: Optional[AsyncIOScheduler] = None
+        # Searches are fixed for the life of the process
+        self._searches: Tuple[SearchCriteria, ...] = tuple(config.get_searches())
+        # Event URLs depend only on static config, so build them once
+        self._event_urls: Dict[SearchCriteria, str] = {
+            search: search.get_event_url(config.monitor.base_url)
+            for search in self._searches
+        }
+        # Per-match locks so an overlapping tick skips matches still in flight
+        self._match_locks: Dict[SearchCriteria, asyncio.Lock] = {}
+        # One filter per search, built on first use and kept across cycles
+        self._filters: Dict[SearchCriteria, TicketFilter] = {}
+        # SMTP/HTTP notification calls block, so run them off the event loop.
+        # A single worker keeps sends ordered and the service single-threaded.
+        self._notify_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notify')
     
     def start(self):
         """Start the monitoring loop."""
         logger.info("Starting ticket monitor...")
-        searches = self.config.get_searches()
+        searches = self._searches
         logger.info(f"Monitoring {len(searches)} match(es):")
         for search in searches:
             logger.info(f"  - {search.match_name}")
         logger.info(f"Check interval: {self.config.monitor.check_interval_minutes} minutes")
         
-        # Run immediately on start
-        self.check_tickets()
-        
-        # Schedule periodic checks
-        trigger = IntervalTrigger(minutes=self.config.monitor.check_interval_minutes)
-        self.scheduler.add_job(
-            self.check_tickets,
-            trigger=trigger,
-            id='ticket_check',
-            name='Check for matching tickets'
-        )
+        # Scraping and the interval trigger share one event loop
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.scheduler = AsyncIOScheduler(event_loop=loop)
         
         try:
+            # Launch Chromium up front so a broken install fails before scheduling
+            loop.run_until_complete(self.scraper.start())
+            
+            # Run immediately on start
+            loop.run_until_complete(self.check_tickets())
+            
+            # Schedule periodic checks on the same event loop
+            trigger = IntervalTrigger(minutes=self.config.monitor.check_interval_minutes)
+            self.scheduler.add_job(
+                self.check_tickets,
+                trigger=trigger,
+                id='ticket_check',
+                name='Check for matching tickets',
+                # A cycle that overruns the interval may overlap with one more
+                # tick, which only checks matches that aren't still in flight
+                # (see _check_match); late ticks collapse into one run.
+                max_instances=2,
+                coalesce=True,
+                misfire_grace_time=300
+            )
             self.scheduler.start()
+            loop.run_forever()
         except (KeyboardInterrupt, SystemExit):
             logger.info("Stopping ticket monitor...")
-            self.scheduler.shutdown()
+            if self.scheduler.running:
+                self.scheduler.shutdown(wait=False)
+        finally:
+            # Cancel checks still in flight so they unwind before the browser
+            # and notification worker they use are closed underneath them
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(self.close())
+            loop.close()
     
-    def check_tickets(self):
-        """Perform a single check cycle for all matches."""
-        searches = self.config.get_searches()
+    async def check_tickets(self):
+        """Perform a single check cycle, polling all matches concurrently."""
+        searches = self._searches
         
-        for search in searches:
-            self._check_match(search)
+        # Page loads dominate a cycle, so overlap them across matches
+        results = await asyncio.gather(
+            *(self._check_match(search) for search in searches),
+            return_exceptions=True
+        )
+        for search, result in zip(searches, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Check for {search.match_name} failed: {result!r}")
     
-    def _check_match(self, search: SearchCriteria):
-        """Check tickets for a single match."""
+    async def _check_match(self, search: SearchCriteria):
+        """Check tickets for a single match unless its previous check is still running."""
+        lock = self._match_locks.get(search)
+        if lock is None:
+            lock = self._match_locks[search] = asyncio.Lock()
+        
+        if lock.locked():
+            logger.info(f"Previous check for {search.match_name} still in flight, skipping")
+            return
+        
+        async with lock:
+            await self._run_match_check(search)
+    
+    async def _run_match_check(self, search: SearchCriteria):
+        """Scrape, filter, record and notify for a single match."""
         logger.info("=" * 60)
         logger.info(f"Checking tickets for {search.match_name}")
         
         try:
             # Get event URL
-            event_url = search.get_event_url(self.config.monitor.base_url)
+            event_url = self._event_urls[search]
             logger.info(f"Event URL: {event_url}")
             
-            # Scrape tickets
-            all_tickets = self.scraper.scrape_event(event_url)
+            # Scrape tickets (the scraper bounds how many pages load at once)
+            all_tickets = await self.scraper.scrape_event(event_url)
             
             if not all_tickets:
                 logger.warning(f"No tickets found for {search.match_name}")
                 return
             
-            # Create filter for this match's criteria
-            ticket_filter = TicketFilter(search)
+            # Reuse the filter for this match's criteria
+            ticket_filter = self._filters.get(search)
+            if ticket_filter is None:
+                ticket_filter = self._filters[search] = TicketFilter(search)
             
             # Filter tickets by criteria
             matching_tickets = ticket_filter.filter_tickets(all_tickets)
@@ -96,24 +160,41 @@ class TicketMonitor:
                 # User wants reminders of all current matching listings, including previously seen
                 if matching_tickets:
                     logger.info(f"Sending notification for {len(matching_tickets)} matching ticket(s) for {search.match_name} (including previously seen)")
-                    self.notifications.send_notification(
-                        matching_tickets,
-                        search.match_name
-                    )
+                    await self._notify(matching_tickets, search.match_name)
             else:
                 # Default: only notify for new tickets
                 if new_tickets:
                     logger.info(f"Found {len(new_tickets)} new matching ticket(s) for {search.match_name}!")
-                    self.notifications.send_notification(
-                        new_tickets,
-                        search.match_name
-                    )
+                    await self._notify(new_tickets, search.match_name)
                 else:
                     logger.info(f"No new tickets found for {search.match_name}")
         
         except Exception as e:
             logger.error(f"Error checking {search.match_name}: {e}", exc_info=True)
     
+    async def _notify(self, tickets: List[Dict], match_name: str):
+        """Send notifications on the worker thread so other matches keep scraping."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(
+            self._notify_executor,
+            self.notifications.send_notification,
+            tickets,
+            match_name
+        )
+    
     def run_once(self):
         """Run a single check without scheduling (useful for testing)."""
-        self.check_tickets()
+        asyncio.run(self._run_once())
+    
+    async def _run_once(self):
+        try:
+            await self.check_tickets()
+        finally:
+            await self.close()
+    
+    async def close(self):
+        """Release resources held across check cycles."""
+        await self.scraper.close()
+        self._notify_executor.shutdown(wait=True)
+        self.notifications.close()
+        self.database.close()
@@ -5,6 +5,7 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import List, Dict, Optional
 import requests
+from requests.adapters import HTTPAdapter
 import subprocess
 import platform
 
@@ -12,12 +13,29 @@ from config import NotificationSettings
 
 logger = logging.getLogger(__name__)
 
+# AppleScript that shows argv[1] as a notification titled argv[2]
+_OSASCRIPT_NOTIFY = (
+    'on run argv\n'
+    'display notification (item 1 of argv) with title (item 2 of argv)\n'
+    'end run'
+)
+
 
 class NotificationService:
     """Handles sending notifications through multiple channels."""
     
     def __init__(self, settings: NotificationSettings):
         self.settings = settings
+        # Keep-alive session so repeat Pushover posts skip the TCP/TLS handshake
+        self._http = requests.Session()
+        self._http.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=4))
+        # Logged-in SMTP session, kept open between alerts
+        self._smtp: Optional[smtplib.SMTP] = None
+    
+    def close(self):
+        """Close pooled network connections."""
+        self._http.close()
+        self._drop_smtp()
     
     def send_notification(self, tickets: List[Dict], match_name: str):
         """
@@ -44,35 +62,28 @@ class NotificationService:
     
     def _format_message(self, tickets: List[Dict], match_name: str) -> str:
         """Format ticket information into a readable message."""
-        lines = [
-            f"🎫 Found {len(tickets)} matching ticket(s) for {match_name}!",
-            "",
-        ]
+        blocks = []
         
         for i, ticket in enumerate(tickets, 1):
-            lines.append(f"Ticket {i}:")
-            lines.append(f"  Price: £{ticket.get('price', 'N/A'):.2f}")
-            lines.append(f"  Quantity: {ticket.get('quantity', 'N/A')}")
-            
-            trustable_seller = ticket.get('trustable_seller', False)
-            if trustable_seller:
-                lines.append(f"  Trustable Seller: ✓")
-            
+            price = ticket.get('price')
+            # Missing prices used to crash the :.2f format spec
+            price_text = f"£{price:.2f}" if isinstance(price, (int, float)) else "N/A"
             section = ticket.get('section')
-            if section:
-                lines.append(f"  Section: {section}")
-            
             row = ticket.get('row')
-            if row:
-                lines.append(f"  Row: {row}")
-            
             url = ticket.get('url', '')
-            if url:
-                lines.append(f"  Link: {url}")
             
-            lines.append("")
+            blocks.append(
+                f"Ticket {i}:\n"
+                f"  Price: {price_text}\n"
+                f"  Quantity: {ticket.get('quantity', 'N/A')}\n"
+                + ("  Trustable Seller: ✓\n" if ticket.get('trustable_seller', False) else "")
+                + (f"  Section: {section}\n" if section else "")
+                + (f"  Row: {row}\n" if row else "")
+                + (f"  Link: {url}\n" if url else "")
+            )
         
-        return "\n".join(lines)
+        header = f"🎫 Found {len(tickets)} matching ticket(s) for {match_name}!\n\n"
+        return header + "\n".join(blocks)
     
     def _send_email(self, message: str, subject: str, tickets: List[Dict]):
         """Send email notification."""
@@ -88,17 +99,41 @@ class NotificationService:
             
             msg.attach(MIMEText(message, 'plain'))
             
-            server = smtplib.SMTP(self.settings.email_smtp_server, self.settings.email_smtp_port)
-            server.starttls()
-            server.login(self.settings.email_username, self.settings.email_password)
-            server.send_message(msg)
-            server.quit()
+            self._get_smtp().send_message(msg)
             
             logger.info(f"Email notification sent to {self.settings.email_to}")
         
         except Exception as e:
+            # Start from a fresh session on the next alert
+            self._drop_smtp()
             logger.error(f"Failed to send email: {e}", exc_info=True)
     
+    def _get_smtp(self) -> smtplib.SMTP:
+        """Return a logged-in SMTP session, reconnecting if the server dropped it."""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._drop_smtp()
+        
+        server = smtplib.SMTP(self.settings.email_smtp_server, self.settings.email_smtp_port, timeout=30)
+        server.starttls()
+        server.login(self.settings.email_username, self.settings.email_password)
+        self._smtp = server
+        return server
+    
+    def _drop_smtp(self):
+        """Close the cached SMTP session, if any."""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+    
     def _send_pushover(self, message: str, title: str):
         """Send push notification via Pushover."""
         if not self.settings.pushover_api_key or not self.settings.pushover_user_key:
@@ -115,7 +150,7 @@ class NotificationService:
                 'priority': 1  # High priority
             }
             
-            response = requests.post(url, data=data, timeout=10)
+            response = self._http.post(url, data=data, timeout=10)
             response.raise_for_status()
             
             logger.info("Pushover notification sent")
@@ -129,12 +164,14 @@ class NotificationService:
             system = platform.system()
             
             if system == 'Darwin':  # macOS
-                # Use osascript for macOS notifications
+                # Use osascript for macOS notifications. The text is passed as
+                # argv rather than formatted into the script, so quotes in a
+                # match name can't break (or inject into) the AppleScript.
                 short_message = f"Found {ticket_count} matching ticket(s) for {title}"
-                script = f'''
-                    display notification "{short_message}" with title "Ticket Alert"
-                '''
-                subprocess.run(['osascript', '-e', script], check=False)
+                subprocess.run(
+                    ['osascript', '-e', _OSASCRIPT_NOTIFY, short_message, 'Ticket Alert'],
+                    check=False
+                )
             
             elif system == 'Linux':
                 # Use notify-send for Linux
@@ -1,217 +1,299 @@
 """Playwright-based scraper for fanpass.net ticket listings."""
 import logging
-import hashlib
-import time
+import asyncio
+import re
 from typing import List, Dict, Optional
-from playwright.sync_api import sync_playwright, Page, TimeoutError as PlaywrightTimeoutError
+from urllib.parse import urlsplit
+from playwright.async_api import async_playwright, Browser, Page, Playwright, Route, TimeoutError as PlaywrightTimeoutError
+
+from database import generate_ticket_id
 
 logger = logging.getLogger(__name__)
 
+# Listing price such as "£1,336.50" (commas are stripped before matching)
+_PRICE_RE = re.compile(r'\d+\.?\d*')
+
+# Collects the raw fields of every .listing-row in a single page.evaluate call.
+# Python-side parsing lives in TicketScraper._parse_listing.
+_EXTRACT_LISTINGS_JS = '''() => {
+    // innerText only exists on HTML elements; anything else (e.g. an SVG icon
+    // matched by [class*="row"]) reads as null, as inner_text() failing did
+    const text = node => node instanceof HTMLElement ? node.innerText.trim() : null;
+    
+    // Rows share ancestors, so remember each ancestor's section lookup
+    const ancestorSection = new Map();
+    const sectionIn = parent => {
+        if (!ancestorSection.has(parent)) {
+            ancestorSection.set(parent, parent.querySelector('[class*="section"], [class*="stand"]'));
+        }
+        return ancestorSection.get(parent);
+    };
+    
+    const readRow = el => {
+        // Section/stand: inside the row, else the nearest of up to 5 ancestors
+        let sectionEl = el.querySelector('[class*="section"], [class*="stand"], [data-section]');
+        for (let parent = el.parentElement, i = 0; !sectionEl && parent && i < 5; i++) {
+            sectionEl = sectionIn(parent);
+            parent = parent.parentElement;
+        }
+        
+        const priceEl = el.querySelector('.price');
+        const link = el.querySelector('a[href*="ticket"], a[href*="buy"]');
+        
+        return {
+            desired: el.getAttribute('data-desired'),
+            price: text(priceEl),
+            // .status[data-blue-rh="true"] is covered by the attribute selector
+            trustable: el.querySelector('.by-trustable-seller, [data-blue-rh="true"]') !== null,
+            section: text(sectionEl),
+            row: text(el.querySelector('[class*="row"], [data-row]')),
+            url: link ? link.getAttribute('href') : null,
+        };
+    };
+    
+    return Array.from(document.querySelectorAll('.listing-row')).map(el => {
+        // A row that fails to read is reported as null so the others survive
+        try {
+            return readRow(el);
+        } catch (e) {
+            return null;
+        }
+    });
+}'''
+
+# Requests the listing extraction never needs. Stylesheets are kept because
+# innerText depends on CSS visibility.
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font'})
+_BLOCKED_HOSTS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'facebook.net',
+    'hotjar.com',
+)
+
+# Realistic desktop user agent for every browser context
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+
+async def _block_unneeded_requests(route: Route):
+    """Abort images, media, fonts and tracker requests; let everything else through."""
+    request = route.request
+    host = urlsplit(request.url).hostname or ''
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or any(
+        host == blocked or host.endswith('.' + blocked) for blocked in _BLOCKED_HOSTS
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
 
 class TicketScraper:
     """Scrapes ticket data from fanpass.net using Playwright."""
     
-    def __init__(self, base_url: str = 'https://fanpass.net', headless: bool = True):
+    def __init__(self, base_url: str = 'https://fanpass.net', headless: bool = True,
+                 max_concurrent_pages: int = 4, cdp_endpoint: Optional[str] = None):
         self.base_url = base_url
         self.headless = headless
+        # Attach to an already-running Chromium (e.g. http://localhost:9222)
+        # instead of launching one, so several monitors can share it
+        self.cdp_endpoint = cdp_endpoint
+        # Upper bound on event pages loading at once, to stay polite to fanpass.net
+        self.max_concurrent_pages = max_concurrent_pages
+        self._page_slots: Optional[asyncio.Semaphore] = None
+        # One Chromium shared by every check; launched lazily on first scrape
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+    
+    async def _get_browser(self) -> Browser:
+        """Return the shared browser, connecting on first use or after a crash."""
+        if self._browser_lock is None:
+            # Created here so it binds to the running loop (3.8/3.9)
+            self._browser_lock = asyncio.Lock()
+        
+        async with self._browser_lock:
+            if self._browser is None or not self._browser.is_connected():
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                if self.cdp_endpoint:
+                    logger.info("Connecting to Chromium at %s", self.cdp_endpoint)
+                    self._browser = await self._playwright.chromium.connect_over_cdp(self.cdp_endpoint)
+                else:
+                    logger.info("Launching Chromium")
+                    self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        return self._browser
+    
+    async def start(self):
+        """Launch the shared browser now rather than on the first scrape."""
+        await self._get_browser()
+    
+    async def __aenter__(self) -> 'TicketScraper':
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def close(self):
+        """Shut down the shared browser and the Playwright driver.
+        
+        A browser attached over CDP is only disconnected from (its contexts
+        created here are closed); the Chromium process keeps running.
+        """
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+    
+    async def scrape_events(self, event_urls: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Scrape several event pages concurrently on the shared browser.
+        
+        Args:
+            event_urls: URLs of the event pages
+            
+        Returns:
+            Mapping of event URL to its list of ticket dictionaries
+        """
+        results = await asyncio.gather(*(self.scrape_event(url) for url in event_urls))
+        return dict(zip(event_urls, results))
     
-    def scrape_event(self, event_url: str) -> List[Dict]:
+    async def scrape_event(self, event_url: str) -> List[Dict]:
         """
         Scrape tickets from an event page.
         
+        Concurrent calls share the browser; at most max_concurrent_pages
+        pages load at once and the rest wait their turn.
+        
         Args:
             event_url: URL of the event page
             
         Returns:
             List of ticket dictionaries with keys: price, quantity, section, row, url, ticket_id
         """
+        if self._page_slots is None:
+            self._page_slots = asyncio.Semaphore(self.max_concurrent_pages)
+        
+        async with self._page_slots:
+            return await self._scrape_event(event_url)
+    
+    async def _scrape_event(self, event_url: str) -> List[Dict]:
+        """Load one event page in a fresh context and extract its tickets."""
         tickets = []
         
         try:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=self.headless)
-                page = browser.new_page()
-                
-                # Set a realistic user agent
-                page.set_extra_http_headers({
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                })
-                
-                logger.info(f"Navigating to {event_url}")
-                page.goto(event_url, wait_until='networkidle', timeout=30000)
+            browser = await self._get_browser()
+            
+            # A fresh context per event keeps cookies/storage isolated without
+            # paying for a browser launch
+            context = await browser.new_context(user_agent=USER_AGENT)
+            try:
+                await context.route('**/*', _block_unneeded_requests)
+                page = await context.new_page()
                 
-                # Give the page a moment for JS to render listings
-                time.sleep(3)
+                logger.info("Navigating to %s", event_url)
+                # networkidle can take the full timeout on pages that keep polling;
+                # the listing selector below is what actually signals readiness
+                await page.goto(event_url, wait_until='domcontentloaded', timeout=15000)
                 
                 # Wait for ticket listings to load (.listing-row)
                 try:
-                    page.wait_for_selector('.listing-row', timeout=20000)
+                    await page.wait_for_selector('.listing-row', timeout=20000)
                 except PlaywrightTimeoutError:
                     # Retry once after a longer delay (slower pages / single listing)
                     logger.warning("Ticket listings not ready yet, retrying after 5s...")
-                    time.sleep(5)
+                    await asyncio.sleep(5)
                     try:
-                        page.wait_for_selector('.listing-row', timeout=15000)
+                        await page.wait_for_selector('.listing-row', timeout=15000)
                     except PlaywrightTimeoutError:
                         logger.warning("Ticket listings may not have loaded, continuing anyway")
                 
-                # Extract ticket data
-                tickets = self._extract_tickets(page, event_url)
-                
-                browser.close()
+                # Rows can keep streaming in after the first one renders; give the
+                # listing requests up to 3s to settle rather than always sleeping 3s
+                try:
+                    await page.wait_for_load_state('networkidle', timeout=3000)
+                except PlaywrightTimeoutError:
+                    pass
                 
+                # Extract ticket data
+                tickets = await self._extract_tickets(page, event_url)
+            finally:
+                await context.close()
+        
         except Exception as e:
-            logger.error(f"Error scraping {event_url}: {e}", exc_info=True)
+            logger.error("Error scraping %s: %s", event_url, e, exc_info=True)
         
-        logger.info(f"Found {len(tickets)} tickets")
+        logger.info("Found %d tickets", len(tickets))
         return tickets
     
-    def _extract_tickets(self, page: Page, event_url: str) -> List[Dict]:
+    async def _extract_tickets(self, page: Page, event_url: str) -> List[Dict]:
         """Extract ticket information from the rendered page."""
         tickets = []
         
         try:
-            # Find all ticket listing rows
-            # The site uses .listing-row divs for ticket listings
-            listing_rows = page.query_selector_all('.listing-row')
-            
-            for listing_row in listing_rows:
-                try:
-                    ticket = self._parse_ticket_element(listing_row, event_url)
-                    if ticket:
-                        tickets.append(ticket)
-                except Exception as e:
-                    logger.debug(f"Error parsing ticket element: {e}")
-                    continue
-        
+            # Read every .listing-row in one round-trip to the browser
+            listings = await page.evaluate(_EXTRACT_LISTINGS_JS)
         except Exception as e:
-            logger.error(f"Error extracting tickets: {e}", exc_info=True)
+            logger.error("Error extracting tickets: %s", e, exc_info=True)
+            return tickets
+        
+        for listing in listings:
+            if listing is None:
+                continue
+            try:
+                ticket = self._parse_listing(listing, event_url)
+                if ticket:
+                    tickets.append(ticket)
+            except Exception as e:
+                logger.debug("Error parsing ticket listing: %s", e)
+                continue
         
         return tickets
     
-    def _parse_ticket_element(self, element, event_url: str) -> Optional[Dict]:
-        """Parse a single ticket listing-row element."""
-        try:
-            # Extract quantity from data-desired attribute
-            quantity = self._extract_quantity(element)
-            
-            # Extract price from .price div (contains "£336")
-            price_elem = element.query_selector('.price')
-            if not price_elem:
-                return None
-            
-            price_text = price_elem.inner_text().strip()
-            # Remove "£" and parse price
-            import re
-            price_match = re.search(r'[\d,]+\.?\d*', price_text.replace(',', ''))
-            if not price_match:
-                return None
-            
-            price = float(price_match.group())
-            currency = 'GBP'
-            
-            # Extract trustable seller status
-            trustable_seller = self._extract_trustable_seller(element)
-            
-            # Extract section and row (if available)
-            section = self._extract_section(element)
-            row = self._extract_row(element)
-            
-            # Get ticket URL - might be in a link nearby
-            url_elem = element.query_selector('a[href*="ticket"], a[href*="buy"]')
-            ticket_url = url_elem.get_attribute('href') if url_elem else event_url
-            
-            # Create unique ticket ID
-            ticket_id = self._generate_ticket_id(price, quantity, section, row)
-            
-            return {
-                'price': price,
-                'currency': currency,
-                'quantity': quantity,
-                'section': section,
-                'row': row,
-                'url': ticket_url,
-                'trustable_seller': trustable_seller,
-                'ticket_id': ticket_id
-            }
+    def _parse_listing(self, listing: Dict, event_url: str) -> Optional[Dict]:
+        """Build a ticket dict from the raw fields of one listing-row."""
+        # Price comes from the .price div (contains "£336")
+        price_text = listing.get('price')
+        if price_text is None:
+            return None
         
-        except Exception as e:
-            logger.debug(f"Error parsing ticket element: {e}")
+        # Remove "£" and parse price
+        price_match = _PRICE_RE.search(price_text.strip().replace(',', ''))
+        if not price_match:
             return None
+        
+        price = float(price_match.group())
+        currency = 'GBP'
+        
+        quantity = self._parse_quantity(listing.get('desired'))
+        section = listing.get('section') or None
+        row = listing.get('row') or None
+        
+        # Ticket link if the row has one, otherwise the event page
+        ticket_url = listing.get('url') or event_url
+        
+        # Create unique ticket ID
+        ticket_id = generate_ticket_id(price, quantity, section, row)
+        
+        return {
+            'price': price,
+            'currency': currency,
+            'quantity': quantity,
+            'section': section,
+            'row': row,
+            'url': ticket_url,
+            'trustable_seller': listing.get('trustable', False),
+            'ticket_id': ticket_id
+        }
     
-    def _extract_quantity(self, element) -> int:
-        """Extract quantity from data-desired attribute."""
+    def _parse_quantity(self, data_desired: Optional[str]) -> int:
+        """Parse quantity from the listing-row's data-desired attribute."""
         try:
-            # Quantity is in data-desired attribute of listing-row
-            data_desired = element.get_attribute('data-desired')
             if data_desired:
                 return int(data_desired)
-        except:
+        except ValueError:
             pass
         return 1  # Default to 1 if not found
-    
-    def _extract_section(self, element) -> Optional[str]:
-        """Extract section/stand name from ticket element."""
-        try:
-            # Look for section indicators in the element itself
-            section_elem = element.query_selector('[class*="section"], [class*="stand"], [data-section]')
-            if section_elem:
-                return section_elem.inner_text().strip()
-            
-            # Try to find section in nearby elements using XPath or CSS
-            # Look for section info in the same container
-            try:
-                # Try evaluating JavaScript to find parent with section info
-                section_text = element.evaluate('''el => {
-                    let parent = el.parentElement;
-                    for (let i = 0; i < 5 && parent; i++) {
-                        let section = parent.querySelector('[class*="section"], [class*="stand"]');
-                        if (section) return section.innerText.trim();
-                        parent = parent.parentElement;
-                    }
-                    return null;
-                }''')
-                if section_text:
-                    return section_text
-            except:
-                pass
-        except:
-            pass
-        return None
-    
-    def _extract_row(self, element) -> Optional[str]:
-        """Extract row information from ticket element."""
-        try:
-            row_elem = element.query_selector('[class*="row"], [data-row]')
-            if row_elem:
-                return row_elem.inner_text().strip()
-        except:
-            pass
-        return None
-    
-    def _extract_trustable_seller(self, element) -> bool:
-        """Extract trustable seller status from listing-row element."""
-        try:
-            # Check for .by-trustable-seller class
-            trustable_elem = element.query_selector('.by-trustable-seller')
-            if trustable_elem:
-                return True
-            
-            # Check for data-blue-rh="true" attribute
-            status_elem = element.query_selector('.status[data-blue-rh="true"]')
-            if status_elem:
-                return True
-            
-            # Also check if the listing-row itself or any child has data-blue-rh="true"
-            blue_rh = element.query_selector('[data-blue-rh="true"]')
-            if blue_rh:
-                return True
-        except:
-            pass
-        return False
-    
-    def _generate_ticket_id(self, price: float, quantity: int, section: Optional[str], row: Optional[str]) -> str:
-        """Generate a unique ID for a ticket."""
-        # Create hash from ticket characteristics
-        ticket_str = f"{price}_{quantity}_{section or ''}_{row or ''}"
-        return hashlib.md5(ticket_str.encode()).hexdigest()